@@ -0,0 +1,2 @@
+# Présent à la racine pour que pytest ajoute le dépôt au sys.path
+# (les tests importent flood_risk_analyzer directement)
@@ -8,27 +8,216 @@ Date: 2026-02-04
 """
 
 import rasterio
-from rasterio.windows import from_bounds
+from rasterio.enums import Resampling
+from rasterio.windows import Window, from_bounds
 import numpy as np
 import geopandas as gpd
 from shapely.geometry import Point, box
 import requests
 import logging
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Options GDAL adaptées à la lecture d'un COG via HTTP (/vsicurl/)
+GDAL_ENV_OPTIONS = {
+    'GDAL_CACHEMAX': 512,                       # Cache de blocs (Mo)
+    'VSI_CACHE': True,
+    'VSI_CACHE_SIZE': 512_000_000,              # Cache VSI (octets)
+    'GDAL_HTTP_MULTIRANGE': 'YES',
+    'GDAL_HTTP_MERGE_CONSECUTIVE_RANGES': 'YES',
+    'GDAL_HTTP_VERSION': '2',
+    'CPL_VSIL_CURL_ALLOWED_EXTENSIONS': '.tif',
+    'GDAL_DISABLE_READDIR_ON_OPEN': 'EMPTY_DIR',
+}
+
+# Barèmes du score de risque (source unique des seuils)
+# Facteur altitude (40 points max): < 50m, < 100m, < 200m, au-delà
+ALTITUDE_BINS = np.array([50, 100, 200])
+ALTITUDE_SCORES = np.array([40, 30, 15, 5], dtype=np.int16)
+# Facteur proximité oued (35 points max): < 100m, < 300m, < 500m, < 1000m, au-delà
+DISTANCE_BINS = np.array([100, 300, 500, 1000])
+DISTANCE_SCORES = np.array([35, 25, 15, 5, 0], dtype=np.int16)
+# Facteur précipitations (25 points max): > 10mm, > 30mm, > 50mm, > 80mm
+RAIN_BINS = np.array([10, 30, 50, 80])
+RAIN_SCORES = np.array([0, 5, 12, 20, 25], dtype=np.int16)
+
+# Niveaux de risque: score >= 70, >= 40, >= 20, sinon FAIBLE
+RISK_LEVELS = ['CRITIQUE', 'ÉLEVÉ', 'MODÉRÉ']
+RISK_COLORS = ['#D32F2F', '#F57C00', '#FBC02D']  # Rouge, Orange, Jaune
+DEFAULT_RISK_LEVEL = 'FAIBLE'
+DEFAULT_RISK_COLOR = '#388E3C'  # Vert
+
+
+def _factor_scores(elev, dist, rain):
+    """Points de chaque facteur (altitude, distance oued, pluie)"""
+    altitude_score = ALTITUDE_SCORES[np.digitize(elev, ALTITUDE_BINS)]
+    distance_score = DISTANCE_SCORES[np.digitize(dist, DISTANCE_BINS)]
+    # Seuils de pluie stricts (> 10mm, > 30mm...) d'où right=True
+    rain_score = RAIN_SCORES[np.digitize(rain, RAIN_BINS, right=True)]
+    
+    return altitude_score, distance_score, rain_score
+
+
+def _risk_levels(score):
+    """Niveau de risque et couleur associés au score"""
+    conditions = [score >= 70, score >= 40, score >= 20]
+    risk_level = np.select(conditions, RISK_LEVELS, default=DEFAULT_RISK_LEVEL)
+    color = np.select(conditions, RISK_COLORS, default=DEFAULT_RISK_COLOR)
+    
+    return risk_level, color
+
+
+def score_vectorized(elev, dist, rain):
+    """
+    Calcule le score de risque d'inondation pour des tableaux de points
+    (version vectorisée de FloodRiskAnalyzer.calculate_flood_risk_score)
+    
+    Args:
+        elev: Altitudes en mètres (array)
+        dist: Distances au plus proche oued en mètres (array ou scalaire)
+        rain: Pluies prévues sur 24h en mm (array ou scalaire)
+    
+    Returns:
+        tuple: (score, niveau de risque, couleur) sous forme d'arrays
+    """
+    altitude_score, distance_score, rain_score = _factor_scores(elev, dist, rain)
+    
+    score = altitude_score + distance_score + rain_score
+    risk_level, color = _risk_levels(score)
+    
+    return score, risk_level, color
+
+
+# Noyau Numba compilé à la première utilisation (import paresseux)
+_LOW_ZONE_STATS_KERNEL = None
+
+
+def _get_low_zone_stats_kernel():
+    """
+    Compile (une seule fois) le noyau Numba qui calcule en un seul passage
+    parallèle: nb pixels bas, nb pixels valides, min, max et somme
+    """
+    global _LOW_ZONE_STATS_KERNEL
+    
+    if _LOW_ZONE_STATS_KERNEL is None:
+        from numba import njit, prange
+        
+        @njit(parallel=True)
+        def _stats(values, mask, threshold):
+            low_cnt = 0
+            valid_cnt = 0
+            mn = np.inf
+            mx = -np.inf
+            sm = 0.0
+            
+            # Matrices 2-D (découpes non contiguës): parallélisme par ligne,
+            # sans copie préalable par ravel
+            for r in prange(values.shape[0]):
+                for c in range(values.shape[1]):
+                    if not mask[r, c]:
+                        v = float(values[r, c])
+                        valid_cnt += 1
+                        sm += v
+                        mn = min(mn, v)
+                        mx = max(mx, v)
+                        if v < threshold:
+                            low_cnt += 1
+            
+            return low_cnt, valid_cnt, mn, mx, sm
+        
+        _LOW_ZONE_STATS_KERNEL = _stats
+    
+    return _LOW_ZONE_STATS_KERNEL
+
+
+def _block_aligned_window(window, block_shape, width, height):
+    """
+    Étend une fenêtre aux limites des tuiles internes du COG (ex: 512x512)
+    afin que GDAL lise des tuiles entières, une requête HTTP par tuile
+    
+    Args:
+        window: Fenêtre demandée (rasterio.windows.Window)
+        block_shape: (hauteur, largeur) des tuiles
+        width, height: Dimensions du raster (pour rester dans l'emprise)
+    
+    Returns:
+        Window: Fenêtre alignée sur la grille de tuiles
+    """
+    bh, bw = block_shape
+    
+    col_off = max(0, math.floor(window.col_off / bw) * bw)
+    row_off = max(0, math.floor(window.row_off / bh) * bh)
+    col_end = min(math.ceil((window.col_off + window.width) / bw) * bw, width)
+    row_end = min(math.ceil((window.row_off + window.height) / bh) * bh, height)
+    
+    return Window(col_off, row_off, col_end - col_off, row_end - row_off)
+
 
 class FloodRiskAnalyzer:
     """Classe pour analyser risque inondation via DEM"""
     
-    def __init__(self, dem_url):
+    def __init__(self, dem_url=None, dataset=None):
         """
         Args:
             dem_url: URL du fichier COG (Cloud Optimized GeoTIFF)
                      Ex: https://storage.googleapis.com/votre-bucket/maroc_srtm_30m.tif
+            dataset: Dataset rasterio déjà ouvert (optionnel). Il est alors
+                     utilisé tel quel et n'est pas fermé par l'analyseur
         """
+        if dem_url is None and dataset is None:
+            raise ValueError("dem_url ou dataset doit être fourni")
+        
         self.dem_url = dem_url
+        # Référence conservée: le dataset de l'appelant reste utilisable
+        # après close() (seul un dataset ouvert par l'analyseur est fermé)
+        self._dataset = dataset
+        self._src = None
+        self._inv_transform = None
+        self._nodata = None
+    
+    def _set_src(self, src):
+        """Enregistre le dataset et met en cache ses métadonnées"""
+        self._src = src
+        
+        # Métadonnées mises en cache (utilisées à chaque point)
+        self._inv_transform = ~src.transform
+        self._nodata = src.nodata
+    
+    def _get_src(self):
+        """
+        Retourne le dataset COG, ouvert une seule fois puis réutilisé
+        (évite de re-télécharger l'en-tête du COG à chaque lecture)
+        """
+        if self._src is None:
+            if self._dataset is not None:
+                if self._dataset.closed:
+                    raise ValueError("Le dataset fourni à l'analyseur est fermé")
+                self._set_src(self._dataset)
+            else:
+                with rasterio.Env(**GDAL_ENV_OPTIONS):
+                    self._set_src(rasterio.open(f'/vsicurl/{self.dem_url}'))
+        return self._src
+    
+    def close(self):
+        """Ferme le dataset COG s'il est ouvert"""
+        if getattr(self, '_src', None) is not None:
+            # Un dataset fourni par l'appelant reste à sa charge
+            if self._src is not self._dataset:
+                self._src.close()
+            self._src = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+    
+    def __del__(self):
+        self.close()
         
     def get_elevation(self, lon, lat):
         """
@@ -40,91 +229,224 @@ class FloodRiskAnalyzer:
             lat: Latitude (ex: 33.5731)
         
         Returns:
-            float: Altitude en mètres
+            float: Altitude en mètres (None si NoData ou hors emprise)
         """
         try:
-            # Lecture du GeoTIFF distant via HTTP
-            with rasterio.open(f'/vsicurl/{self.dem_url}') as src:
-                # Conversion coordonnées -> index pixel
-                row, col = src.index(lon, lat)
+            with rasterio.Env(**GDAL_ENV_OPTIONS):
+                # Lecture du GeoTIFF distant via HTTP (handle réutilisé)
+                src = self._get_src()
                 
-                # Lecture valeur pixel
-                elevation = src.read(1, window=((row, row+1), (col, col+1)))[0, 0]
+                # Conversion coordonnées -> index pixel (transformation inverse en cache)
+                col, row = self._inv_transform * (lon, lat)
+                col, row = math.floor(col), math.floor(row)
                 
-                # Gestion valeurs NoData
-                if elevation == src.nodata:
+                # Point hors emprise: GDAL ramènerait la lecture au bord
+                if not (0 <= row < src.height and 0 <= col < src.width):
                     return None
                 
-                return float(elevation)
+                # Lecture valeur pixel
+                elevation = src.read(1, window=((row, row+1), (col, col+1)))[0, 0]
+            
+            # Gestion valeurs NoData
+            if elevation == self._nodata:
+                return None
+            
+            return float(elevation)
                 
         except Exception as e:
             logger.error(f"Erreur lecture DEM: {e}")
             return None
     
-    def get_elevation_zone(self, bbox, resolution=30):
+    def get_elevation_zone(self, bbox, resolution=30, overview_level=1):
         """
         Récupère les altitudes d'une zone rectangulaire
         
         Args:
             bbox: (min_lon, min_lat, max_lon, max_lat)
             resolution: Résolution en mètres (défaut 30m SRTM)
+            overview_level: Facteur de sous-échantillonnage k (défaut 1 =
+                            pleine résolution). Pour k > 1, GDAL lit les
+                            overviews internes du COG (k² fois moins de
+                            données transférées)
         
         Returns:
-            numpy.array: Matrice d'altitudes
+            numpy.ma.MaskedArray: Matrice d'altitudes (NoData masqué), dans le
+                                  type natif du raster (int16 pour SRTM)
         """
         try:
-            with rasterio.open(f'/vsicurl/{self.dem_url}') as src:
-                # Définir fenêtre de lecture
-                window = from_bounds(*bbox, transform=src.transform)
-                
-                # Lecture des données
-                elevation_data = src.read(1, window=window)
-                
-                # Remplacer NoData par NaN
-                elevation_data = np.where(
-                    elevation_data == src.nodata,
-                    np.nan,
-                    elevation_data
-                )
-                
-                return elevation_data
+            return self._read_zone(self._get_src(), bbox, overview_level)
                 
         except Exception as e:
             logger.error(f"Erreur lecture zone DEM: {e}")
             return None
     
-    def identify_low_zones(self, bbox, threshold=100):
+    def _read_zone(self, src, bbox, overview_level):
+        """Lecture d'une zone sur le dataset fourni (voir get_elevation_zone)"""
+        # Définir fenêtre de lecture en pixels entiers, limitée à l'emprise
+        # du raster (sinon le bourrage des tuiles déborde dans le découpage)
+        bounds_window = from_bounds(*bbox, transform=src.transform).intersection(
+            Window(0, 0, src.width, src.height)
+        )
+        window = Window(
+            math.floor(bounds_window.col_off),
+            math.floor(bounds_window.row_off),
+            max(1, round(bounds_window.width)),
+            max(1, round(bounds_window.height))
+        ).intersection(Window(0, 0, src.width, src.height))
+        
+        # Fenêtre alignée sur les tuiles du COG
+        aligned = _block_aligned_window(
+            window, src.block_shapes[0], src.width, src.height
+        )
+        
+        # Lecture des données (via les overviews si k > 1)
+        # NoData masqué directement par rasterio (pas de copie en NaN)
+        k = max(1, overview_level)
+        with rasterio.Env(**GDAL_ENV_OPTIONS):
+            elevation_data = src.read(
+                1,
+                window=aligned,
+                out_shape=(
+                    max(1, int(aligned.height) // k),
+                    max(1, int(aligned.width) // k)
+                ),
+                resampling=Resampling.average,
+                masked=True
+            )
+        
+        # Redécoupage en mémoire sur la zone demandée
+        row_start = (window.row_off - aligned.row_off) // k
+        col_start = (window.col_off - aligned.col_off) // k
+        n_rows = max(1, window.height // k)
+        n_cols = max(1, window.width // k)
+        
+        elevation_data = elevation_data[
+            row_start:row_start + n_rows,
+            col_start:col_start + n_cols
+        ]
+        
+        # Type natif conservé (int16 SRTM); float64 ramené en float32
+        if elevation_data.dtype == np.float64:
+            elevation_data = elevation_data.astype(np.float32, copy=False)
+        
+        return elevation_data
+    
+    def get_elevations_for_bboxes(self, bboxes, overview_level=1, max_workers=8):
+        """
+        Récupère les altitudes de plusieurs zones en parallèle
+        Les lectures /vsicurl/ libèrent le GIL pendant l'attente réseau:
+        chaque thread utilise son propre dataset (non thread-safe)
+        
+        Args:
+            bboxes: Liste de (min_lon, min_lat, max_lon, max_lat)
+            overview_level: Facteur de sous-échantillonnage (voir get_elevation_zone)
+            max_workers: Nombre de threads (défaut 8)
+        
+        Returns:
+            list: Une matrice d'altitudes (ou None en cas d'erreur) par bbox,
+                  dans l'ordre des bboxes
+        """
+        if self.dem_url is not None:
+            path = f'/vsicurl/{self.dem_url}'
+        else:
+            path = self._dataset.name
+        
+        local = threading.local()
+        opened = []
+        lock = threading.Lock()
+        
+        def read_bbox(bbox):
+            try:
+                with rasterio.Env(**GDAL_ENV_OPTIONS):
+                    src = getattr(local, 'src', None)
+                    if src is None:
+                        src = local.src = rasterio.open(path)
+                        with lock:
+                            opened.append(src)
+                    
+                    return self._read_zone(src, bbox, overview_level)
+                    
+            except Exception as e:
+                logger.error(f"Erreur lecture zone DEM {bbox}: {e}")
+                return None
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(read_bbox, bboxes))
+        finally:
+            for src in opened:
+                src.close()
+    
+    def identify_low_zones(self, bbox, threshold=100, overview_level=4):
         """
         Identifie les zones basses (< threshold mètres)
         
         Args:
             bbox: (min_lon, min_lat, max_lon, max_lat)
             threshold: Altitude seuil en mètres (défaut 100m)
+            overview_level: Sous-échantillonnage de la lecture DEM (défaut 4),
+                            suffisant pour des statistiques agrégées
         
         Returns:
             dict: Statistiques zones basses
         """
-        elevation_data = self.get_elevation_zone(bbox)
+        elevation_data = self.get_elevation_zone(bbox, overview_level=overview_level)
         
         if elevation_data is None:
             return None
         
-        # Masque zones basses
-        low_zones = elevation_data < threshold
+        # Statistiques en un seul passage sur la matrice (pixels NoData exclus)
+        stats_kernel = _get_low_zone_stats_kernel()
+        low_zone_pixels, valid_pixels, min_elev, max_elev, sum_elev = stats_kernel(
+            elevation_data.data,
+            np.ma.getmaskarray(elevation_data),
+            float(threshold)
+        )
         
         stats = {
             'total_pixels': elevation_data.size,
-            'low_zone_pixels': np.sum(low_zones),
-            'low_zone_percentage': (np.sum(low_zones) / elevation_data.size) * 100,
-            'min_elevation': float(np.nanmin(elevation_data)),
-            'max_elevation': float(np.nanmax(elevation_data)),
-            'mean_elevation': float(np.nanmean(elevation_data))
+            'low_zone_pixels': int(low_zone_pixels),
+            'low_zone_percentage': (low_zone_pixels / elevation_data.size) * 100,
+            'min_elevation': float(min_elev) if valid_pixels else float('nan'),
+            'max_elevation': float(max_elev) if valid_pixels else float('nan'),
+            'mean_elevation': sum_elev / valid_pixels if valid_pixels else float('nan')
         }
         
         logger.info(f"Zones basses (<{threshold}m): {stats['low_zone_percentage']:.2f}%")
         
         return stats
     
+    def get_elevations(self, coords):
+        """
+        Récupère les altitudes de plusieurs points en une passe
+        Utilise src.sample: les lectures sont regroupées par bloc et
+        profitent du cache GDAL (au lieu d'une lecture 1x1 par point)
+        
+        Args:
+            coords: Itérable de (lon, lat)
+        
+        Returns:
+            numpy.array: Altitudes en mètres (float32, NaN si NoData ou hors
+                         emprise), ou None en cas d'erreur
+        """
+        try:
+            with rasterio.Env(**GDAL_ENV_OPTIONS):
+                src = self._get_src()
+                
+                # NoData et points hors emprise masqués (sinon rasterio
+                # renvoie 0 hors emprise quand le COG n'a pas de NoData)
+                samples = src.sample(coords, indexes=1, masked=True)
+                elevations = np.fromiter(
+                    (np.nan if np.ma.is_masked(value) else value[0] for value in samples),
+                    dtype=np.float32
+                )
+            
+            return elevations
+            
+        except Exception as e:
+            logger.error(f"Erreur lecture altitudes DEM: {e}")
+            return None
+    
     def calculate_flood_risk_score(self, lon, lat, waterway_distance, precipitation_24h):
         """
         Calcule un score de risque d'inondation (0-100)
@@ -143,69 +465,25 @@ class FloodRiskAnalyzer:
         if elevation is None:
             return {'error': 'Altitude non disponible'}
         
-        # 2. Calcul du score
-        score = 0
-        details = {}
-        
-        # Facteur altitude (40 points max)
-        if elevation < 50:
-            altitude_score = 40
-        elif elevation < 100:
-            altitude_score = 30
-        elif elevation < 200:
-            altitude_score = 15
-        else:
-            altitude_score = 5
-        
-        score += altitude_score
-        details['altitude_m'] = elevation
-        details['altitude_score'] = altitude_score
-        
-        # Facteur proximité oued (35 points max)
-        if waterway_distance < 100:
-            distance_score = 35
-        elif waterway_distance < 300:
-            distance_score = 25
-        elif waterway_distance < 500:
-            distance_score = 15
-        elif waterway_distance < 1000:
-            distance_score = 5
-        else:
-            distance_score = 0
-        
-        score += distance_score
-        details['distance_oued_m'] = waterway_distance
-        details['distance_score'] = distance_score
-        
-        # Facteur précipitations (25 points max)
-        if precipitation_24h > 80:
-            rain_score = 25
-        elif precipitation_24h > 50:
-            rain_score = 20
-        elif precipitation_24h > 30:
-            rain_score = 12
-        elif precipitation_24h > 10:
-            rain_score = 5
-        else:
-            rain_score = 0
+        # 2. Calcul du score (mêmes barèmes que score_vectorized)
+        altitude_score, distance_score, rain_score = (
+            int(factor) for factor in _factor_scores(
+                elevation, waterway_distance, precipitation_24h
+            )
+        )
+        score = altitude_score + distance_score + rain_score
         
-        score += rain_score
-        details['pluie_24h_mm'] = precipitation_24h
-        details['pluie_score'] = rain_score
+        details = {
+            'altitude_m': elevation,
+            'altitude_score': altitude_score,
+            'distance_oued_m': waterway_distance,
+            'distance_score': distance_score,
+            'pluie_24h_mm': precipitation_24h,
+            'pluie_score': rain_score
+        }
         
         # Déterminer niveau de risque
-        if score >= 70:
-            risk_level = "CRITIQUE"
-            color = "#D32F2F"  # Rouge
-        elif score >= 40:
-            risk_level = "ÉLEVÉ"
-            color = "#F57C00"  # Orange
-        elif score >= 20:
-            risk_level = "MODÉRÉ"
-            color = "#FBC02D"  # Jaune
-        else:
-            risk_level = "FAIBLE"
-            color = "#388E3C"  # Vert
+        risk_level, color = (str(value) for value in _risk_levels(score))
         
         return {
             'score': score,
@@ -215,7 +493,47 @@ class FloodRiskAnalyzer:
             'coordinates': {'lon': lon, 'lat': lat}
         }
     
-    def analyze_populated_areas(self, buildings_geojson, bbox, precipitation_24h):
+    def _waterway_distances(self, centroids, oueds):
+        """
+        Distance (mètres) de chaque centroïde au plus proche oued
+        Utilise sjoin_nearest (index spatial STRtree) au lieu d'une boucle
+        bâtiments x oueds
+        
+        Args:
+            centroids: GeoSeries des centroïdes des bâtiments (EPSG:4326)
+            oueds: GeoDataFrame des cours d'eau (table oueds, géométrie active
+                   quelle que soit sa colonne, ex: 'geom')
+        
+        Returns:
+            numpy.array: Distances en mètres, alignées sur centroids
+        """
+        # Projection UTM locale pour des distances en mètres
+        metric_crs = centroids.estimate_utm_crs()
+        
+        # Index positionnel: l'index OSM peut être multiple ou non unique
+        points = gpd.GeoDataFrame(
+            geometry=centroids.to_crs(metric_crs).reset_index(drop=True)
+        )
+        # Colonne géométrique active quel que soit son nom ('geom' en base)
+        oueds_metric = gpd.GeoDataFrame(geometry=oueds.geometry.to_crs(metric_crs))
+        
+        joined = gpd.sjoin_nearest(points, oueds_metric, distance_col='oued_dist')
+        
+        # En cas d'égalité sjoin_nearest renvoie plusieurs lignes par point
+        distances = joined.groupby(level=0)['oued_dist'].min()
+        
+        return distances.reindex(range(len(points))).to_numpy()
+    
+    def _empty_risk_results(self):
+        """GeoDataFrame vide ayant les colonnes de analyze_populated_areas"""
+        return gpd.GeoDataFrame(
+            {'risk_score': [], 'risk_level': [], 'elevation': []},
+            geometry=[],
+            crs='EPSG:4326'
+        )
+    
+    def analyze_populated_areas(self, buildings_geojson, bbox, precipitation_24h,
+                                oueds=None):
         """
         Analyse le risque pour les zones habitées
         
@@ -223,35 +541,51 @@ class FloodRiskAnalyzer:
             buildings_geojson: GeoDataFrame des bâtiments (OSM)
             bbox: Zone d'analyse
             precipitation_24h: Pluies prévues
+            oueds: GeoDataFrame des cours d'eau (optionnel). Sans oueds,
+                   une distance fictive de 500m est utilisée (MVP)
         
         Returns:
             GeoDataFrame avec score de risque par bâtiment
         """
-        results = []
+        if buildings_geojson.empty:
+            return self._empty_risk_results()
         
-        for idx, building in buildings_geojson.iterrows():
-            centroid = building.geometry.centroid
-            
-            # Calculer distance au plus proche oued (à implémenter)
+        # Centroïdes de tous les bâtiments, calculés en une fois
+        centroids = buildings_geojson.geometry.centroid
+        xs = centroids.x.to_numpy()
+        ys = centroids.y.to_numpy()
+        
+        # Altitudes de tous les bâtiments en une seule passe sur le COG
+        elevations = self.get_elevations(zip(xs, ys))
+        
+        if elevations is None:
+            return self._empty_risk_results()
+        
+        # Distance au plus proche oued
+        if oueds is not None and not oueds.empty:
+            waterway_distance = self._waterway_distances(centroids, oueds)
+        else:
             # Pour le MVP, distance fictive
-            waterway_distance = 500  # TODO: Calcul réel
-            
-            risk = self.calculate_flood_risk_score(
-                centroid.x,
-                centroid.y,
-                waterway_distance,
-                precipitation_24h
-            )
-            
-            if 'error' not in risk:
-                results.append({
-                    'geometry': building.geometry,
-                    'risk_score': risk['score'],
-                    'risk_level': risk['risk_level'],
-                    'elevation': risk['details']['altitude_m']
-                })
-        
-        return gpd.GeoDataFrame(results, crs='EPSG:4326')
+            waterway_distance = np.full(len(elevations), 500.0)
+        
+        # Bâtiments sans altitude (NoData) ignorés
+        valid = ~np.isnan(elevations)
+        elevations = elevations[valid]
+        waterway_distance = waterway_distance[valid]
+        
+        scores, risk_levels, _ = score_vectorized(
+            elevations, waterway_distance, precipitation_24h
+        )
+        
+        return gpd.GeoDataFrame(
+            {
+                'risk_score': scores,
+                'risk_level': risk_levels,
+                'elevation': elevations
+            },
+            geometry=buildings_geojson.geometry.to_numpy()[valid],
+            crs='EPSG:4326'
+        )
 
 
 def example_usage():
@@ -49,8 +49,12 @@ print("\n5. Creating dummy barrages_data.json...")
 import json
 from datetime import datetime
 
+now = datetime.now()
+now_date = now.strftime('%Y-%m-%d')
+now_iso = now.isoformat()
+
 dummy_data = {
-    'date_extraction': datetime.now().isoformat(),
+    'date_extraction': now_iso,
     'source': 'test',
     'nombre_barrages': 1,
     'barrages': [
@@ -60,8 +64,8 @@ dummy_data = {
             'capacite_totale': 2760,
             'volume_actuel': 1456,
             'taux_remplissage': 52.8,
-            'date_maj': datetime.now().strftime('%Y-%m-%d'),
-            'timestamp': datetime.now().isoformat()
+            'date_maj': now_date,
+            'timestamp': now_iso
         }
     ]
 }
@@ -0,0 +1,179 @@
+# -*- coding: utf-8 -*-
+"""
+Lectures DEM de FloodRiskAnalyzer comparées à des lectures rasterio/numpy
+simples, sur un petit GeoTIFF tuilé écrit dans tmp_path
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+rasterio = pytest.importorskip('rasterio')
+pytest.importorskip('geopandas')
+pytest.importorskip('numba')
+
+from rasterio.transform import from_origin
+from rasterio.windows import Window, from_bounds
+
+from flood_risk_analyzer import FloodRiskAnalyzer
+
+
+NODATA = -32768
+SIZE = 1200
+PIXEL = 0.0005
+ORIGIN = (-8.0, 34.0)  # Coin haut-gauche (lon, lat)
+
+
+@pytest.fixture(scope='module')
+def dem_path(tmp_path_factory):
+    """GeoTIFF int16 tuilé (256x256) avec une zone NoData"""
+    rng = np.random.default_rng(42)
+    data = rng.integers(0, 1000, size=(SIZE, SIZE)).astype(np.int16)
+    data[100:180, 300:420] = NODATA
+
+    path = tmp_path_factory.mktemp('dem') / 'dem.tif'
+    with rasterio.open(
+        path, 'w',
+        driver='GTiff',
+        width=SIZE, height=SIZE, count=1,
+        dtype='int16', nodata=NODATA, crs='EPSG:4326',
+        transform=from_origin(*ORIGIN, PIXEL, PIXEL),
+        tiled=True, blockxsize=256, blockysize=256
+    ) as dst:
+        dst.write(data, 1)
+
+    return str(path)
+
+
+@pytest.fixture
+def dem(dem_path):
+    with rasterio.open(dem_path) as src:
+        yield src
+
+
+@pytest.fixture
+def analyzer(dem):
+    analyzer = FloodRiskAnalyzer(dataset=dem)
+    yield analyzer
+    analyzer.close()
+
+
+def reference_zone(src, bbox):
+    """Lecture directe de la bbox limitée à l'emprise, en pixels entiers"""
+    window = from_bounds(*bbox, transform=src.transform).intersection(
+        Window(0, 0, src.width, src.height)
+    )
+    window = Window(
+        math.floor(window.col_off),
+        math.floor(window.row_off),
+        max(1, round(window.width)),
+        max(1, round(window.height))
+    ).intersection(Window(0, 0, src.width, src.height))
+    return src.read(1, window=window, masked=True)
+
+
+def assert_same_masked(actual, expected):
+    assert actual.shape == expected.shape
+    np.testing.assert_array_equal(np.ma.getmaskarray(actual), np.ma.getmaskarray(expected))
+    np.testing.assert_array_equal(actual.filled(NODATA), expected.filled(NODATA))
+
+
+@pytest.mark.parametrize('bbox', [
+    (-7.9, 33.6, -7.6, 33.9),     # Intérieur, à cheval sur plusieurs tuiles
+    (-7.85, 33.85, -7.75, 33.95),  # Inclut la zone NoData
+    (-7.5, 33.45, -7.45, 33.5),   # Dernières tuiles (partielles)
+])
+def test_get_elevation_zone_interior_matches_plain_read(analyzer, dem, bbox):
+    expected = dem.read(1, window=from_bounds(*bbox, transform=dem.transform), masked=True)
+
+    assert_same_masked(analyzer.get_elevation_zone(bbox), expected)
+
+
+@pytest.mark.parametrize('bbox', [
+    (-8.2, 33.5, -7.5, 34.3),   # Déborde en haut et à gauche
+    (-7.6, 33.2, -7.2, 33.6),   # Déborde en bas et à droite
+    (-8.1, 33.3, -7.3, 34.1),   # Déborde de tous les côtés
+])
+def test_get_elevation_zone_edge_crossing_has_no_tile_padding(analyzer, dem, bbox):
+    baseline = dem.read(1, window=from_bounds(*bbox, transform=dem.transform), masked=True)
+    zone = analyzer.get_elevation_zone(bbox)
+
+    assert zone.shape == baseline.shape
+    assert_same_masked(zone, reference_zone(dem, bbox))
+
+
+@pytest.mark.parametrize('bbox', [
+    (-7.90013, 33.60021, -7.60037, 33.80049),
+    (-8.00031, 33.40007, -7.79989, 33.59977),
+])
+def test_get_elevation_zone_fractional_bbox(analyzer, dem, bbox):
+    baseline = dem.read(1, window=from_bounds(*bbox, transform=dem.transform))
+    zone = analyzer.get_elevation_zone(bbox)
+
+    assert zone.shape == baseline.shape
+    assert_same_masked(zone, reference_zone(dem, bbox))
+
+
+def test_get_elevation_zone_outside_raster_returns_none(analyzer):
+    assert analyzer.get_elevation_zone((10.0, 10.0, 11.0, 11.0)) is None
+
+
+@pytest.mark.parametrize('bbox', [
+    (-7.9, 33.6, -7.6, 33.9),
+    (-8.2, 33.5, -7.5, 34.3),
+])
+def test_identify_low_zones_matches_numpy(analyzer, dem, bbox):
+    threshold = 250
+    data = dem.read(
+        1, window=from_bounds(*bbox, transform=dem.transform), masked=True
+    ).astype(np.float64).filled(np.nan)
+
+    stats = analyzer.identify_low_zones(bbox, threshold=threshold, overview_level=1)
+
+    assert stats['total_pixels'] == data.size
+    assert stats['low_zone_pixels'] == np.sum(data < threshold)
+    assert stats['low_zone_percentage'] == pytest.approx(
+        np.sum(data < threshold) / data.size * 100
+    )
+    assert stats['min_elevation'] == np.nanmin(data)
+    assert stats['max_elevation'] == np.nanmax(data)
+    assert stats['mean_elevation'] == pytest.approx(np.nanmean(data))
+
+
+def test_get_elevations_nan_for_nodata_and_out_of_extent(analyzer, dem):
+    inside = (-7.7, 33.7)
+    nodata_point = (ORIGIN[0] + 350.5 * PIXEL, ORIGIN[1] - 150.5 * PIXEL)
+    outside = [(-9.0, 33.6), (-7.5, 35.0)]
+
+    elevations = analyzer.get_elevations([inside, nodata_point] + outside)
+
+    row, col = dem.index(*inside)
+    assert elevations.dtype == np.float32
+    assert elevations[0] == dem.read(1)[row, col]
+    assert np.isnan(elevations[1:]).all()
+
+
+def test_get_elevation_none_for_nodata_and_out_of_extent(analyzer, dem):
+    row, col = dem.index(-7.7, 33.7)
+
+    assert analyzer.get_elevation(-7.7, 33.7) == dem.read(1)[row, col]
+    assert analyzer.get_elevation(ORIGIN[0] + 350.5 * PIXEL, ORIGIN[1] - 150.5 * PIXEL) is None
+    assert analyzer.get_elevation(-9.0, 33.6) is None
+
+
+def test_get_elevations_for_bboxes_keeps_order_and_isolates_errors(analyzer, dem):
+    bboxes = [
+        (-7.9, 33.6, -7.6, 33.9),
+        (10.0, 10.0, 11.0, 11.0),  # Hors emprise
+        (-8.2, 33.5, -7.5, 34.3),
+        (-7.5, 33.45, -7.45, 33.5),
+    ]
+
+    results = analyzer.get_elevations_for_bboxes(bboxes, max_workers=3)
+
+    assert len(results) == len(bboxes)
+    assert results[1] is None
+    for bbox, result in zip(bboxes, results):
+        if result is not None:
+            assert_same_masked(result, reference_zone(dem, bbox))
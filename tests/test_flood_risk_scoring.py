@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""
+Vérifie que le barème vectorisé (score_vectorized) et le calcul par point
+(calculate_flood_risk_score) donnent les mêmes scores aux bornes des seuils
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+
+pytest.importorskip('rasterio')
+pytest.importorskip('geopandas')
+
+from flood_risk_analyzer import FloodRiskAnalyzer, score_vectorized
+
+
+ELEVATIONS = [0, 49.9, 50, 50.1, 99.9, 100, 100.1, 199.9, 200, 200.1, 500]
+DISTANCES = [0, 99.9, 100, 100.1, 299.9, 300, 300.1, 499.9, 500, 500.1,
+             999.9, 1000, 1000.1, 5000]
+RAINS = [0, 9.9, 10, 10.1, 29.9, 30, 30.1, 49.9, 50, 50.1, 79.9, 80, 80.1, 150]
+
+
+def reference_score(elevation, waterway_distance, precipitation_24h):
+    """Barème d'origine (chaîne if/elif) servant de référence"""
+    if elevation < 50:
+        score = 40
+    elif elevation < 100:
+        score = 30
+    elif elevation < 200:
+        score = 15
+    else:
+        score = 5
+
+    if waterway_distance < 100:
+        score += 35
+    elif waterway_distance < 300:
+        score += 25
+    elif waterway_distance < 500:
+        score += 15
+    elif waterway_distance < 1000:
+        score += 5
+
+    if precipitation_24h > 80:
+        score += 25
+    elif precipitation_24h > 50:
+        score += 20
+    elif precipitation_24h > 30:
+        score += 12
+    elif precipitation_24h > 10:
+        score += 5
+
+    if score >= 70:
+        return score, 'CRITIQUE'
+    if score >= 40:
+        return score, 'ÉLEVÉ'
+    if score >= 20:
+        return score, 'MODÉRÉ'
+    return score, 'FAIBLE'
+
+
+def test_score_vectorized_matches_reference_at_bin_edges():
+    combos = list(itertools.product(ELEVATIONS, DISTANCES, RAINS))
+    elev, dist, rain = (np.array(values) for values in zip(*combos))
+
+    scores, levels, colors = score_vectorized(elev, dist, rain)
+
+    for i, combo in enumerate(combos):
+        assert (int(scores[i]), str(levels[i])) == reference_score(*combo), combo
+    assert set(colors) <= {'#D32F2F', '#F57C00', '#FBC02D', '#388E3C'}
+
+
+def test_calculate_flood_risk_score_matches_score_vectorized(monkeypatch):
+    analyzer = FloodRiskAnalyzer('https://example.invalid/dem.tif')
+
+    for elevation, distance, rain in itertools.product(ELEVATIONS, DISTANCES, RAINS):
+        monkeypatch.setattr(analyzer, 'get_elevation', lambda lon, lat: elevation)
+
+        risk = analyzer.calculate_flood_risk_score(-7.5, 33.5, distance, rain)
+        score, level, color = score_vectorized(
+            np.array([elevation]), distance, rain
+        )
+
+        assert risk['score'] == int(score[0])
+        assert risk['risk_level'] == str(level[0])
+        assert risk['color'] == str(color[0])
+        assert risk['score'] == (
+            risk['details']['altitude_score']
+            + risk['details']['distance_score']
+            + risk['details']['pluie_score']
+        )